@@ -0,0 +1,51 @@
+"""
+Build per-category thumbnail sprite atlases for the NEU-DET browser.
+
+Packs every category's images into one ``(N, 200, 200, 3)`` uint8 array
+saved as ``data/atlas/<category>.npy``.  NEUDatasetLoader memory-maps
+these at browse time, so the Tab 4 grid becomes an ndarray slice instead
+of 12 JPEG decodes per rerun.
+
+Run once after downloading the dataset:
+    python build_neu_atlas.py
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import NEU_DET_ATLAS_DIR
+from detection.neu_det_loader import NEUDatasetLoader
+
+THUMB_SIZE = 200
+
+
+def main() -> None:
+    loader = NEUDatasetLoader()
+    if not loader.categories:
+        print("⚠️  NEU-DET dataset not found — nothing to build.")
+        return
+
+    os.makedirs(NEU_DET_ATLAS_DIR, exist_ok=True)
+
+    for cat in loader.categories:
+        paths = loader.images_for_category(cat)
+        atlas = np.zeros((len(paths), THUMB_SIZE, THUMB_SIZE, 3), dtype=np.uint8)
+        for i, path in enumerate(paths):
+            img = cv2.imread(path)
+            if img is None:
+                continue
+            atlas[i] = cv2.resize(
+                img, (THUMB_SIZE, THUMB_SIZE), interpolation=cv2.INTER_AREA
+            )
+        out_path = os.path.join(NEU_DET_ATLAS_DIR, f"{cat}.npy")
+        np.save(out_path, atlas)
+        print(f"✅  {cat}: {len(paths)} thumbnails → {out_path}")
+
+
+if __name__ == "__main__":
+    main()
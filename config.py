@@ -21,9 +21,33 @@ NVIDIA_EMBED_MODEL: str = "nvidia/nv-embedqa-e5-v5"
 # ── Paths ───────────────────────────────────────────────────────────────────
 SQLITE_DB_PATH: str = "data/defects.db"
 FAISS_INDEX_PATH: str = "data/faiss_index"
+
+# Corpus size at which ingestion switches from exact IndexFlatL2 to an
+# approximate HNSW graph. Below this, a flat scan is both faster and
+# exact; above it, graph search wins by orders of magnitude.
+FAISS_HNSW_THRESHOLD: int = 10_000
 DOCS_DIR: str = "docs/"
 SENSOR_DATA_PATH: str = "data/sensor_data.csv"
 SAMPLE_IMAGES_DIR: str = "data/sample_images/"
+EMBED_CACHE_PATH: str = "data/embed_cache.db"
+
+# ── NEU-DET dataset paths ──────────────────────────────────────────────────
+NEU_DET_ROOT: str = "data/sample_images/NEU-DET"
+NEU_DET_TRAIN_IMAGES: str = "data/sample_images/NEU-DET/train/images"
+NEU_DET_TRAIN_ANNOTATIONS: str = "data/sample_images/NEU-DET/train/annotations"
+NEU_DET_VAL_IMAGES: str = "data/sample_images/NEU-DET/validation/images"
+NEU_DET_VAL_ANNOTATIONS: str = "data/sample_images/NEU-DET/validation/annotations"
+NEU_DET_ATLAS_DIR: str = "data/atlas"
+
+# NEU-DET defect categories (directory / filename prefixes)
+NEU_DEFECT_TYPES: list[str] = [
+    "crazing",
+    "inclusion",
+    "patches",
+    "pitted_surface",
+    "rolled-in_scale",
+    "scratches",
+]
 
 # ── Sensor thresholds ──────────────────────────────────────────────────────
 # Forming-zone temperature thresholds (°C).
@@ -1 +1 @@
-from .database import init_db, log_defect_event, get_recent_defects, get_defect_summary, get_sensor_context, populate_from_sensor_csv
+from .database import init_db, log_defect_event, get_recent_defects, get_defect_summary, get_sensor_context, get_sensor_data, populate_from_sensor_csv
@@ -1,2 +1,2 @@
-from .video_processor import VideoProcessor
+from .video_processor import DefectResult, VideoProcessor
 from .defect_simulator import DefectSimulator
@@ -0,0 +1,44 @@
+"""
+Ahead-of-time build for the detection scoring kernel.
+
+Produces ``detection/_kernels.<abi>.so`` via numba.pycc so the runtime
+imports an ordinary C extension instead of paying the JIT compile on
+first use.  Run once at package build time:
+
+    python detection/_kernels_build.py
+
+video_processor falls back to @njit (and then to NumPy) when the
+extension is absent, so this step is optional — including on numba
+0.61+, where ``numba.pycc`` has been removed and this script exits
+with a notice instead of building.
+"""
+
+import sys
+
+try:
+    from numba.pycc import CC
+except ImportError:
+    sys.exit(
+        "numba.pycc is not available (numba missing, or numba >= 0.61 "
+        "where pycc was removed) — AOT build skipped. The runtime will "
+        "use the @njit JIT or NumPy fallback in video_processor instead."
+    )
+
+cc = CC("_kernels")
+cc.verbose = True
+
+
+@cc.export("score", "Tuple((float64, boolean, float64))(uint8[:], float64)")
+def score(flat_mask, thr):
+    count = 0
+    for i in range(flat_mask.size):
+        if flat_mask[i]:
+            count += 1
+    pct = count * 100.0 / flat_mask.size
+    has = pct > thr
+    conf = min(1.0, pct / 25.0) if has else pct / 50.0
+    return pct, has, conf
+
+
+if __name__ == "__main__":
+    cc.compile()
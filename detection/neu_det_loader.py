@@ -18,15 +18,26 @@ Categories: crazing, inclusion, patches, pitted_surface, rolled-in_scale, scratc
 """
 
 import os
+import pickle
 import re
-import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+# lxml's C parser is ~2-3× faster for the bulk annotation parse at loader
+# init; the stdlib parser is a drop-in fallback (same find/findtext API).
+try:
+    from lxml import etree as ET  # type: ignore
+except ImportError:
+    import xml.etree.ElementTree as ET  # type: ignore
 from dataclasses import dataclass, field
 from typing import Optional
 
 import cv2
 import numpy as np
+import pandas as pd
 
 from config import (
+    NEU_DET_ATLAS_DIR,
     NEU_DET_TRAIN_ANNOTATIONS,
     NEU_DET_TRAIN_IMAGES,
     NEU_DET_VAL_ANNOTATIONS,
@@ -77,15 +88,17 @@ def parse_annotation(xml_path: str) -> Optional[NEUAnnotation]:
         defect_type = _defect_type_from_filename(filename)
 
         boxes: list[BoundingBox] = []
-        for obj in root.findall("object"):
+        for obj in root.iter("object"):
             label = obj.findtext("name", defect_type)
             bbox = obj.find("bndbox")
             if bbox is not None:
+                # One pass over the children instead of four findtext walks
+                coords = {c.tag: c.text for c in bbox}
                 boxes.append(BoundingBox(
-                    xmin=int(bbox.findtext("xmin", "0")),
-                    ymin=int(bbox.findtext("ymin", "0")),
-                    xmax=int(bbox.findtext("xmax", "0")),
-                    ymax=int(bbox.findtext("ymax", "0")),
+                    xmin=int(coords.get("xmin") or 0),
+                    ymin=int(coords.get("ymin") or 0),
+                    xmax=int(coords.get("xmax") or 0),
+                    ymax=int(coords.get("ymax") or 0),
                     label=label,
                 ))
 
@@ -100,6 +113,19 @@ def parse_annotation(xml_path: str) -> Optional[NEUAnnotation]:
         return None
 
 
+# Alternation sorted longest-first so multi-word categories win
+# (e.g. "pitted_surface" before "patches" could otherwise mis-match).
+# Compiled once at import — the per-call sorted() + startswith scan it
+# replaces was measurable over a multi-thousand-file dataset walk.
+_CAT_RE = re.compile(
+    "^(" + "|".join(
+        re.escape(c) for c in sorted(NEU_DEFECT_TYPES, key=len, reverse=True)
+    ) + ")"
+)
+_STEM_RE = re.compile(r"^(.+?)_\d+$")
+
+
+@lru_cache(maxsize=4096)
 def _defect_type_from_filename(filename: str) -> str:
     """Extract defect category from a NEU-DET filename.
 
@@ -109,12 +135,11 @@ def _defect_type_from_filename(filename: str) -> str:
         ``pitted_surface_42.jpg``→ ``pitted_surface``
     """
     stem = os.path.splitext(filename)[0]  # e.g. "crazing_1"
-    # Match known categories (longest first to handle multi-word names)
-    for cat in sorted(NEU_DEFECT_TYPES, key=len, reverse=True):
-        if stem.startswith(cat):
-            return cat
+    m = _CAT_RE.match(stem)
+    if m:
+        return m.group(1)
     # Fallback: everything before the last underscore+digits
-    match = re.match(r"^(.+?)_\d+$", stem)
+    match = _STEM_RE.match(stem)
     return match.group(1) if match else stem
 
 
@@ -135,28 +160,116 @@ class NEUDatasetLoader:
         self.annotations_dir = annotations_dir
         self._index: dict[str, list[str]] = {}  # category → [image_paths]
         self._annotations: dict[str, NEUAnnotation] = {}  # stem → annotation
-        self._build_index()
+        self._annotated_cache: dict[str, np.ndarray] = {}  # stem → drawn frame
+        self._atlases: dict[str, Optional[np.ndarray]] = {}  # category → mmap
+        # The directory walk + XML parse dominates construction time, so
+        # the result is persisted to a pickle sidecar keyed on directory
+        # mtimes — subsequent loads (e.g. a fresh Streamlit process) are
+        # a single pickle.load.
+        if not self._load_index_cache():
+            self._build_index()
+            self._save_index_cache()
+        # Materialised once — Streamlit calls the accessors below from a
+        # selectbox format_func, i.e. for every option on every rerun, so
+        # they must be plain lookups rather than re-sorts/re-counts.
+        self._categories: list[str] = sorted(self._index.keys())
+        self._category_counts: dict[str, int] = {
+            cat: len(self._index[cat]) for cat in self._categories
+        }
+        # Display-ready counts for st.bar_chart — built once, the index
+        # is immutable for the lifetime of the loader.
+        self._category_series: pd.Series = pd.Series(
+            {cat.replace("_", " ").title(): count
+             for cat, count in self._category_counts.items()},
+            name="Count",
+        ).rename_axis("Category")
 
     # ── Indexing ────────────────────────────────────────────────────────
 
+    _IMG_EXTS = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def _index_cache_path(self) -> str:
+        return os.path.join(
+            os.path.dirname(self.images_dir.rstrip(os.sep)), ".neu_index.pkl"
+        )
+
+    def _dir_mtimes(self) -> tuple[float, float]:
+        return (
+            os.path.getmtime(self.images_dir)
+            if os.path.isdir(self.images_dir) else 0.0,
+            os.path.getmtime(self.annotations_dir)
+            if os.path.isdir(self.annotations_dir) else 0.0,
+        )
+
+    def _load_index_cache(self) -> bool:
+        """Restore _index/_annotations from the sidecar if still fresh."""
+        path = self._index_cache_path()
+        try:
+            with open(path, "rb") as fh:
+                payload = pickle.load(fh)
+            if payload.get("mtimes") != self._dir_mtimes():
+                return False
+            self._index = payload["index"]
+            self._annotations = payload["annotations"]
+            return True
+        except (OSError, pickle.UnpicklingError, KeyError, EOFError):
+            return False
+
+    def _save_index_cache(self) -> None:
+        if not self._index:
+            return
+        try:
+            with open(self._index_cache_path(), "wb") as fh:
+                pickle.dump(
+                    {
+                        "mtimes": self._dir_mtimes(),
+                        "index": self._index,
+                        "annotations": self._annotations,
+                    },
+                    fh,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+        except OSError:
+            pass  # read-only filesystem etc. — cache is best-effort
+
     def _build_index(self) -> None:
         """Walk the images directory and group files by defect category."""
-        supported = {".png", ".jpg", ".jpeg", ".bmp"}
         if not os.path.isdir(self.images_dir):
             return
-        for root, _, files in os.walk(self.images_dir):
-            for f in sorted(files):
-                if os.path.splitext(f)[1].lower() not in supported:
-                    continue
-                path = os.path.join(root, f)
-                cat = _defect_type_from_filename(f)
-                self._index.setdefault(cat, []).append(path)
-
-        # Load annotations
+        # os.scandir returns dirents with cached type info, so recursing
+        # manually avoids the extra stat calls os.walk incurs; each
+        # category list is sorted once at the end instead of sorting
+        # every directory listing.
+        stack = [self.images_dir]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(self._IMG_EXTS):
+                        cat = _defect_type_from_filename(entry.name)
+                        self._index.setdefault(cat, []).append(entry.path)
+        for paths in self._index.values():
+            paths.sort(key=os.path.basename)
+
+        # Load annotations.  Parsing ~1800 XMLs is CPU-bound and
+        # embarrassingly parallel, so fan it out across cores; small
+        # batches aren't worth the process spawn overhead.
         if os.path.isdir(self.annotations_dir):
-            for f in os.listdir(self.annotations_dir):
-                if f.endswith(".xml"):
-                    ann = parse_annotation(os.path.join(self.annotations_dir, f))
+            xml_paths = [
+                os.path.join(self.annotations_dir, f)
+                for f in os.listdir(self.annotations_dir)
+                if f.endswith(".xml")
+            ]
+            if len(xml_paths) > 200:
+                with ProcessPoolExecutor() as ex:
+                    parsed = ex.map(parse_annotation, xml_paths, chunksize=64)
+                    for ann in parsed:
+                        if ann:
+                            self._annotations[ann.image_stem] = ann
+            else:
+                for path in xml_paths:
+                    ann = parse_annotation(path)
                     if ann:
                         self._annotations[ann.image_stem] = ann
 
@@ -164,45 +277,111 @@ class NEUDatasetLoader:
 
     @property
     def categories(self) -> list[str]:
-        """Return available defect categories (sorted)."""
-        return sorted(self._index.keys())
+        """Return available defect categories (sorted, precomputed)."""
+        return self._categories
 
     def images_for_category(self, category: str) -> list[str]:
         """Return all image paths for a given defect category."""
         return self._index.get(category, [])
 
     def total_images(self) -> int:
-        return sum(len(v) for v in self._index.values())
+        return sum(self._category_counts.values())
 
     def category_counts(self) -> dict[str, int]:
-        return {cat: len(paths) for cat, paths in sorted(self._index.items())}
+        return self._category_counts
 
     def get_annotation(self, image_path: str) -> Optional[NEUAnnotation]:
         """Retrieve the annotation for a given image path (if available)."""
         stem = os.path.splitext(os.path.basename(image_path))[0]
         return self._annotations.get(stem)
 
+    # ── Thumbnail atlas ─────────────────────────────────────────────────
+
+    def thumbnail(self, category: str, i: int) -> Optional[np.ndarray]:
+        """Return the i-th 200×200 BGR thumbnail for *category*, or None.
+
+        Thumbnails come from the pre-built sprite atlas (see
+        ``build_neu_atlas.py``), memory-mapped on first access — a grid
+        render is then a page-cache slice instead of a JPEG decode.
+        Returns None when no atlas was built for the category.
+        """
+        if category not in self._atlases:
+            atlas_path = os.path.join(NEU_DET_ATLAS_DIR, f"{category}.npy")
+            self._atlases[category] = (
+                np.load(atlas_path, mmap_mode="r")
+                if os.path.exists(atlas_path) else None
+            )
+        atlas = self._atlases[category]
+        if atlas is None or not 0 <= i < len(atlas):
+            return None
+        return atlas[i]
+
     # ── Visualization helpers ───────────────────────────────────────────
 
+    # Bounded memo for annotated frames (~120 KB per 200×200 entry)
+    _ANNOTATED_CACHE_MAX = 256
+
+    _COLOR_MAP = {
+        "crazing": (0, 165, 255),        # orange
+        "inclusion": (0, 0, 255),         # red
+        "patches": (255, 0, 0),           # blue
+        "pitted_surface": (0, 255, 255),  # yellow
+        "rolled-in_scale": (255, 0, 255), # magenta
+        "scratches": (0, 255, 0),         # green
+    }
+    # label → (pretty text, (text_w, text_h)); labels repeat across boxes
+    # and frames, so measure each one with cv2.getTextSize exactly once.
+    _label_cache: dict[str, tuple[str, tuple[int, int]]] = {}
+
     def draw_annotations(
-        self, frame: np.ndarray, annotation: NEUAnnotation
+        self,
+        frame: np.ndarray,
+        annotation: NEUAnnotation,
+        inplace: bool = False,
     ) -> np.ndarray:
-        """Draw bounding boxes and labels on a frame copy."""
-        display = frame.copy()
-        color_map = {
-            "crazing": (0, 165, 255),        # orange
-            "inclusion": (0, 0, 255),         # red
-            "patches": (255, 0, 0),           # blue
-            "pitted_surface": (0, 255, 255),  # yellow
-            "rolled-in_scale": (255, 0, 255), # magenta
-            "scratches": (0, 255, 0),         # green
-        }
+        """Draw bounding boxes and labels on a frame.
+
+        The annotated version of a given NEU-DET file never changes, so
+        results are memoized per image stem and repeat calls (one per
+        Streamlit rerun) skip the rectangle/text draw pass entirely.
+        The returned array is shared — callers must not draw on it.
+
+        With ``inplace=True`` the caller's frame is drawn on directly
+        (no copy, no memoization) — for throwaway preview frames where
+        the full-frame memcpy would dominate.
+        """
+        if not inplace:
+            cached = self._annotated_cache.get(annotation.image_stem)
+            if cached is not None and cached.shape == frame.shape:
+                return cached
+
+        display = frame if inplace else frame.copy()
+
+        # Batch the box outlines: one polylines call per colour group
+        # instead of one cv2.rectangle round-trip per box.
+        by_color: dict[tuple[int, int, int], list[list[int]]] = {}
         for box in annotation.boxes:
-            color = color_map.get(box.label, (0, 0, 255))
-            cv2.rectangle(display, (box.xmin, box.ymin), (box.xmax, box.ymax), color, 2)
-            label_text = box.label.replace("_", " ").title()
+            color = self._COLOR_MAP.get(box.label, (0, 0, 255))
+            by_color.setdefault(color, []).append(
+                [box.xmin, box.ymin, box.xmax, box.ymax]
+            )
+        for color, rects in by_color.items():
+            b = np.asarray(rects, dtype=np.int32)
+            pts = np.stack(
+                [b[:, [0, 1]], b[:, [2, 1]], b[:, [2, 3]], b[:, [0, 3]]],
+                axis=1,
+            )
+            cv2.polylines(display, pts, isClosed=True, color=color, thickness=2)
+
+        for box in annotation.boxes:
+            color = self._COLOR_MAP.get(box.label, (0, 0, 255))
+            entry = self._label_cache.get(box.label)
+            if entry is None:
+                text = box.label.replace("_", " ").title()
+                size, _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+                entry = self._label_cache[box.label] = (text, size)
+            label_text, (tw, th) = entry
             # Background for text
-            (tw, th), _ = cv2.getTextSize(label_text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
             cv2.rectangle(
                 display,
                 (box.xmin, box.ymin - th - 6),
@@ -219,6 +398,12 @@ class NEUDatasetLoader:
                 (255, 255, 255),
                 1,
             )
+
+        if not inplace:
+            if len(self._annotated_cache) >= self._ANNOTATED_CACHE_MAX:
+                # Evict the oldest entry (dicts preserve insertion order)
+                self._annotated_cache.pop(next(iter(self._annotated_cache)))
+            self._annotated_cache[annotation.image_stem] = display
         return display
 
     def get_dataset_stats(self) -> dict:
@@ -228,5 +413,6 @@ class NEUDatasetLoader:
             "total_images": self.total_images(),
             "categories": len(counts),
             "category_counts": counts,
+            "category_series": self._category_series,
             "total_annotations": len(self._annotations),
         }
@@ -1,3 +1,3 @@
 from .ingest import load_documents, chunk_documents, get_embeddings_batch, build_faiss_index, load_faiss_index
-from .retriever import retrieve_relevant_docs
+from .retriever import retrieve_relevant_docs, retrieve_relevant_docs_batch
 from .generator import build_rag_prompt, call_nvidia_llm, query_copilot
@@ -0,0 +1,83 @@
+"""
+Persistent on-disk cache for NIM embedding vectors.
+
+Vectors are keyed by a digest of (model, input_type, text), so index
+rebuilds only pay the embedding API for chunks whose content actually
+changed — everything else is served from a small SQLite table beside the
+rest of the data files.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from config import EMBED_CACHE_PATH
+
+_TLS = threading.local()
+
+
+def _connect() -> sqlite3.Connection:
+    """Return this thread's cache connection, creating table on first use."""
+    conn = getattr(_TLS, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(EMBED_CACHE_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(EMBED_CACHE_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                hash  TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                dim   INTEGER NOT NULL,
+                vec   BLOB NOT NULL
+            )
+            """
+        )
+        _TLS.conn = conn
+    return conn
+
+
+def text_key(text: str, model: str, input_type: str) -> str:
+    """Digest identifying one embedding request (model + type + content)."""
+    payload = f"{model}\x00{input_type}\x00{text}".encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def get_many(keys: list[str]) -> dict[str, np.ndarray]:
+    """Fetch cached vectors for *keys*; absent keys are simply missing."""
+    found: dict[str, np.ndarray] = {}
+    if not keys:
+        return found
+    conn = _connect()
+    # Chunk the IN (...) list to stay well under SQLite's parameter limit
+    for start in range(0, len(keys), 500):
+        part = keys[start : start + 500]
+        rows = conn.execute(
+            f"SELECT hash, vec FROM embeddings "
+            f"WHERE hash IN ({','.join('?' * len(part))})",
+            part,
+        )
+        for h, blob in rows:
+            found[h] = np.frombuffer(blob, dtype=np.float32)
+    return found
+
+
+def put_many(vectors: dict[str, np.ndarray], model: str) -> None:
+    """Store freshly embedded vectors keyed by their request digest."""
+    if not vectors:
+        return
+    conn = _connect()
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (hash, model, dim, vec) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (h, model, len(v),
+                 np.ascontiguousarray(v, dtype=np.float32).tobytes())
+                for h, v in vectors.items()
+            ],
+        )
@@ -10,10 +10,17 @@ This is the orchestration layer of the RAG pipeline:
      and supporting sensor metrics for the UI correlation panel.
 """
 
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 from openai import OpenAI
 
 from config import (
+    FAISS_INDEX_PATH,
     NVIDIA_API_KEY,
     NVIDIA_BASE_URL,
     NVIDIA_LLM_MODEL,
@@ -21,12 +28,15 @@ from config import (
     TEMP_WARNING,
 )
 from db.database import get_defect_summary, get_sensor_context
-from rag.ingest import load_faiss_index
+from rag.ingest import load_faiss_index, tuned_http_client
 from rag.retriever import retrieve_relevant_docs
 from utils.metrics import LatencyTracker
 
 # ── NVIDIA NIM client ───────────────────────────────────────────────────────
-_client = OpenAI(base_url=NVIDIA_BASE_URL, api_key=NVIDIA_API_KEY)
+_client = OpenAI(
+    base_url=NVIDIA_BASE_URL, api_key=NVIDIA_API_KEY,
+    http_client=tuned_http_client(),
+)
 
 # ── System prompt ───────────────────────────────────────────────────────────
 _SYSTEM_PROMPT = """You are an expert manufacturing copilot assistant for a metal forming production facility.
@@ -56,17 +66,33 @@ ANALYSIS RULES — follow these strictly:
    - Keep the total response under 300 words
    - Use bold for key values like temperatures, valve IDs, and timestamps"""
 
+# ── User prompt template (compiled once; per-query calls only fill slots) ───
+_PROMPT_TEMPLATE = """## Current Sensor Data (Last {time_window_hours}h on {line_id})
+Defect Summary: {defect_count} defects detected, average defect rate: {avg_rate}%
+Defect Types: {type_breakdown}
+Peak Forming Zone Temperature: {peak_temp}°C at {peak_temp_time}
+Min Coolant Flow in Window: {current_flow}% (nominal: 97-100%)
+Average Line Speed: {current_speed} m/min (nominal: 45 m/min)
+Temperature Trend: {temp_trend}
+Coolant Flow Trend: {flow_trend}
+
+## Relevant Historical Documents
+{formatted_docs}
+
+## Operator Question
+{user_question}
+
+Provide your analysis following the rules above."""
+
 
 # ── Trend helper ────────────────────────────────────────────────────────────
 
-def _get_trend_description(values: list[float], label: str) -> str:
+def _get_trend_description(values: np.ndarray, label: str) -> str:
     """Describe whether a metric is rising, falling, or stable over the window."""
     if len(values) < 2:
         return "insufficient data"
     half = len(values) // 2
-    first_avg = sum(values[:half]) / half
-    second_avg = sum(values[half:]) / max(len(values) - half, 1)
-    diff = second_avg - first_avg
+    diff = float(values[half:].mean() - values[:half].mean())
     if diff > 3:
         return f"rising (increased by {diff:.1f} over the window)"
     elif diff < -3:
@@ -74,22 +100,79 @@ def _get_trend_description(values: list[float], label: str) -> str:
     return "stable"
 
 
-def _load_trend_series(hours: float, line_id: str) -> dict:
+# Only the columns trends need — parsing the rest would be wasted work.
+_TREND_COLUMNS = [
+    "timestamp", "line_id",
+    "forming_zone_temp_c", "coolant_flow_pct", "line_speed_mpm",
+]
+
+
+def _read_csv_tail(path: str, n_rows: int) -> io.BytesIO:
+    """Return the header plus the last *n_rows* data lines of *path*.
+
+    Seeks from the end of the file in 64 KB blocks, so parse cost is
+    proportional to the window rather than the whole history.
+    """
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b""
+        while pos > len(header) and data.count(b"\n") <= n_rows:
+            step = min(64 * 1024, pos - len(header))
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.splitlines()[-n_rows:] if n_rows else []
+    return io.BytesIO(header + b"\n".join(lines))
+
+
+@lru_cache(maxsize=8)
+def _load_trend_tail_cached(path: str, mtime: float, n_rows: int) -> pd.DataFrame:
+    """Parse the last *n_rows* trend rows once per CSV version."""
+    return pd.read_csv(
+        _read_csv_tail(path, n_rows),
+        usecols=_TREND_COLUMNS, parse_dates=["timestamp"],
+    )
+
+
+def _load_trend_series(hours: float, line_id: str) -> dict[str, np.ndarray]:
     """Load raw sensor time-series from CSV for trend calculation."""
     try:
-        df = pd.read_csv(SENSOR_DATA_PATH, parse_dates=["timestamp"])
-        if line_id:
-            df = df[df["line_id"] == line_id]
+        mtime = os.path.getmtime(SENSOR_DATA_PATH)
         # Use the last N rows proportional to requested hours (5-min intervals)
         n_rows = int(hours * 12)  # 12 rows per hour at 5-min spacing
+        # Over-fetch 2× so the line_id filter still leaves a full window
+        df = _load_trend_tail_cached(SENSOR_DATA_PATH, mtime, n_rows * 2)
+        if line_id:
+            df = df[df["line_id"] == line_id]
         window = df.tail(n_rows) if n_rows < len(df) else df
         return {
-            "temp_values": window["forming_zone_temp_c"].dropna().tolist(),
-            "flow_values": window["coolant_flow_pct"].dropna().tolist(),
-            "speed_values": window["line_speed_mpm"].dropna().tolist(),
+            "temp_values": window["forming_zone_temp_c"].dropna().to_numpy(),
+            "flow_values": window["coolant_flow_pct"].dropna().to_numpy(),
+            "speed_values": window["line_speed_mpm"].dropna().to_numpy(),
         }
     except Exception:
-        return {"temp_values": [], "flow_values": [], "speed_values": []}
+        empty = np.empty(0)
+        return {"temp_values": empty, "flow_values": empty, "speed_values": empty}
+
+
+# ── FAISS index cache ───────────────────────────────────────────────────────
+
+@lru_cache(maxsize=1)
+def _load_index_cached(index_mtime: float, meta_mtime: float):
+    """Load the FAISS index once per on-disk version (keyed on mtimes)."""
+    return load_faiss_index()
+
+
+def _get_index():
+    """Return ``(index, chunks)``, re-reading disk only when the files change."""
+    try:
+        index_mtime = os.path.getmtime(f"{FAISS_INDEX_PATH}.index")
+        meta_mtime = os.path.getmtime(f"{FAISS_INDEX_PATH}.pkl")
+    except OSError:
+        return None, None
+    return _load_index_cached(index_mtime, meta_mtime)
 
 
 # ── Prompt builder ──────────────────────────────────────────────────────────
@@ -133,43 +216,45 @@ def build_rag_prompt(
 
     # ── Documents ───────────────────────────────────────────────────────
     if relevant_docs:
-        doc_parts: list[str] = []
-        for i, doc in enumerate(relevant_docs, 1):
-            doc_parts.append(
+        # Stream into one buffer instead of materializing a parts list
+        buf = io.StringIO()
+        for doc in relevant_docs:
+            if buf.tell():
+                buf.write("\n\n")
+            buf.write(
                 f"### [{doc['source']}] (relevance score: {doc['score']})\n{doc['content']}"
             )
-        formatted_docs = "\n\n".join(doc_parts)
+        formatted_docs = buf.getvalue()
     else:
         formatted_docs = (
             "No documents available. Answer based on sensor data "
             "and general manufacturing knowledge."
         )
 
-    prompt = f"""## Current Sensor Data (Last {time_window_hours}h on {line_id})
-Defect Summary: {defect_count} defects detected, average defect rate: {avg_rate}%
-Defect Types: {type_breakdown}
-Peak Forming Zone Temperature: {peak_temp}°C at {peak_temp_time}
-Min Coolant Flow in Window: {current_flow}% (nominal: 97-100%)
-Average Line Speed: {current_speed} m/min (nominal: 45 m/min)
-Temperature Trend: {temp_trend}
-Coolant Flow Trend: {flow_trend}
-
-## Relevant Historical Documents
-{formatted_docs}
-
-## Operator Question
-{user_question}
-
-Provide your analysis following the rules above."""
-
-    return prompt
+    return _PROMPT_TEMPLATE.format_map({
+        "time_window_hours": time_window_hours,
+        "line_id": line_id,
+        "defect_count": defect_count,
+        "avg_rate": avg_rate,
+        "type_breakdown": type_breakdown,
+        "peak_temp": peak_temp,
+        "peak_temp_time": peak_temp_time,
+        "current_flow": current_flow,
+        "current_speed": current_speed,
+        "temp_trend": temp_trend,
+        "flow_trend": flow_trend,
+        "formatted_docs": formatted_docs,
+        "user_question": user_question,
+    })
 
 
 # ── LLM call ────────────────────────────────────────────────────────────────
 
-def call_nvidia_llm(prompt: str) -> str:
-    """Call the NVIDIA NIM LLM endpoint and return the text response.
+def call_nvidia_llm_stream(prompt: str):
+    """Call the NVIDIA NIM LLM endpoint, yielding the response incrementally.
 
+    Streaming cuts time-to-first-visible-output from full-generation
+    latency to first-token latency, which matters for the chat UI.
     Uses ``temperature=0.3`` for deterministic, fact-grounded answers —
     manufacturing operators need reliability over creativity.
     """
@@ -182,10 +267,18 @@ def call_nvidia_llm(prompt: str) -> str:
             ],
             temperature=0.3,
             max_tokens=1024,
+            stream=True,
         )
-        return response.choices[0].message.content or ""
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
     except Exception as exc:
-        return f"❌ LLM API error: {exc}"
+        yield f"❌ LLM API error: {exc}"
+
+
+def call_nvidia_llm(prompt: str) -> str:
+    """Call the NVIDIA NIM LLM endpoint and return the full text response."""
+    return "".join(call_nvidia_llm_stream(prompt))
 
 
 # ── Main orchestration ──────────────────────────────────────────────────────
@@ -194,36 +287,54 @@ def query_copilot(
     user_question: str,
     time_window_hours: float = 1.0,
     line_id: str = "LINE-3",
+    stream: bool = False,
 ) -> dict:
     """End-to-end RAG pipeline: DB → FAISS → prompt → LLM → response.
 
+    With ``stream=True``, ``answer`` is a generator of response chunks
+    instead of the full string; the ``llm_call``/``total`` entries in
+    ``latency_breakdown`` are filled in once the generator is exhausted.
+
     Returns
     -------
     dict
-        ``answer``           – the LLM response text
+        ``answer``           – the LLM response text (or chunk generator)
         ``sources``          – list of source document filenames referenced
         ``latency_breakdown``– per-step latency dict
         ``metrics``          – supporting sensor metrics for the UI panel
     """
     tracker = LatencyTracker()
 
-    # Step 1 — Defect summary
-    tracker.start("db_defect_summary")
-    defect_summary = get_defect_summary(hours=time_window_hours, line_id=line_id)
-    tracker.stop("db_defect_summary")
-
-    # Step 2 — Sensor context
-    tracker.start("db_sensor_context")
-    sensor_context = get_sensor_context(hours=time_window_hours, line_id=line_id)
-    tracker.stop("db_sensor_context")
+    def _timed(step_name, fn, *args, **kwargs):
+        tracker.start(step_name)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            tracker.stop(step_name)
+
+    def _retrieval():
+        index, chunks = _get_index()
+        if index is None or chunks is None:
+            return []
+        return retrieve_relevant_docs(user_question, index, chunks, top_k=8)
+
+    # Steps 1–3 — defect summary, sensor context, and RAG retrieval are
+    # mutually independent, so run them concurrently; the prep phase then
+    # costs max(t1, t2, t3) instead of their sum.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        f_summary = executor.submit(
+            _timed, "db_defect_summary", get_defect_summary,
+            hours=time_window_hours, line_id=line_id,
+        )
+        f_context = executor.submit(
+            _timed, "db_sensor_context", get_sensor_context,
+            hours=time_window_hours, line_id=line_id,
+        )
+        f_docs = executor.submit(_timed, "rag_retrieval", _retrieval)
 
-    # Step 3 — RAG retrieval
-    tracker.start("rag_retrieval")
-    index, chunks = load_faiss_index()
-    relevant_docs: list[dict] = []
-    if index is not None and chunks is not None:
-        relevant_docs = retrieve_relevant_docs(user_question, index, chunks, top_k=8)
-    tracker.stop("rag_retrieval")
+        defect_summary = f_summary.result()
+        sensor_context = f_context.result()
+        relevant_docs: list[dict] = f_docs.result()
 
     # Step 4 — Build prompt
     tracker.start("prompt_assembly")
@@ -234,12 +345,23 @@ def query_copilot(
     tracker.stop("prompt_assembly")
 
     # Step 5 — LLM call
-    tracker.start("llm_call")
-    answer = call_nvidia_llm(prompt)
-    tracker.stop("llm_call")
+    if stream:
+        latency = tracker.get_metrics()
+
+        def _answer_stream():
+            tracker.start("llm_call")
+            try:
+                yield from call_nvidia_llm_stream(prompt)
+            finally:
+                tracker.stop("llm_call")
+                latency.update(tracker.get_metrics())
+
+        answer = _answer_stream()
+    else:
+        answer = _timed("llm_call", call_nvidia_llm, prompt)
+        latency = tracker.get_metrics()
 
     sources = list({doc["source"] for doc in relevant_docs})
-    latency = tracker.get_metrics()
 
     # ── Supporting metrics for the UI correlation panel ──────────────────
     ft = sensor_context.get("forming_zone_temp", {})
@@ -7,7 +7,10 @@ finds the closest document chunks in the FAISS index while ensuring the
 result set references multiple source documents.
 """
 
-from collections import defaultdict
+import re
+import sys
+import weakref
+from collections import OrderedDict
 from typing import Optional
 
 import faiss
@@ -15,10 +18,198 @@ import numpy as np
 
 from rag.ingest import get_embeddings_batch
 
+# Memoized results per (normalized question, parameters, index identity).
+# Operators re-ask the same dashboard questions constantly; a hit skips
+# both the embedding network roundtrip and the FAISS search.  Keying on
+# id(index) ties entries to the loaded index object, so a rebuilt/reloaded
+# index naturally invalidates them; because a freed index's id can be
+# reused, each entry also carries a weakref to its index, validated on
+# lookup.
+_QUERY_CACHE: dict[tuple, tuple["weakref.ref", list[dict]]] = {}
+_QUERY_CACHE_MAX = 256
+
+
+def _query_cache_get(cache_key: tuple, index) -> Optional[list[dict]]:
+    """Look up *cache_key*, evicting entries whose index is gone/reused."""
+    entry = _QUERY_CACHE.get(cache_key)
+    if entry is None:
+        return None
+    ref, results = entry
+    if ref() is not index:
+        _QUERY_CACHE.pop(cache_key, None)
+        return None
+    return results
+
+
+def _query_cache_put(cache_key: tuple, index, results: list[dict]) -> None:
+    if len(_QUERY_CACHE) >= _QUERY_CACHE_MAX:
+        _QUERY_CACHE.pop(next(iter(_QUERY_CACHE)))
+    _QUERY_CACHE[cache_key] = (weakref.ref(index), results)
+
+
+def _normalize_query(query: str) -> str:
+    """Collapse whitespace and case so trivially rephrased queries hit."""
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+# Query-embedding LRU, separate from the result cache above: embeddings
+# stay valid across index reloads and differing search parameters, so a
+# repeated question never pays the embedding roundtrip twice even when
+# the result-cache key has changed.
+_EMBED_CACHE: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_EMBED_CACHE_MAX = 512
+
+
+def _embed_query(query: str) -> np.ndarray:
+    """Embed *query*, memoized on its normalized text."""
+    key = _normalize_query(query)
+    vec = _EMBED_CACHE.get(key)
+    if vec is not None:
+        _EMBED_CACHE.move_to_end(key)
+        return vec
+    vec = get_embeddings_batch([query], input_type="query")
+    # A failed API call yields a zero vector — don't pin that in the cache
+    if vec.size and vec.any():
+        if len(_EMBED_CACHE) >= _EMBED_CACHE_MAX:
+            _EMBED_CACHE.popitem(last=False)
+        _EMBED_CACHE[key] = vec
+    return vec
+
+
+def _embed_queries(queries: list[str]) -> np.ndarray:
+    """Embed several queries as one (nq, d) matrix, sharing the LRU.
+
+    Cache misses go to the embedding endpoint in a single API call
+    rather than one per query.
+    """
+    keys = [_normalize_query(q) for q in queries]
+    vecs: list[Optional[np.ndarray]] = []
+    for key in keys:
+        vec = _EMBED_CACHE.get(key)
+        if vec is not None:
+            _EMBED_CACHE.move_to_end(key)
+        vecs.append(vec)
+
+    miss = [i for i, v in enumerate(vecs) if v is None]
+    if miss:
+        fresh = get_embeddings_batch([queries[i] for i in miss], input_type="query")
+        for row, i in enumerate(miss):
+            vec = fresh[row : row + 1]
+            vecs[i] = vec
+            # As in _embed_query, never pin a failed (zero) vector
+            if vec.any():
+                if len(_EMBED_CACHE) >= _EMBED_CACHE_MAX:
+                    _EMBED_CACHE.popitem(last=False)
+                _EMBED_CACHE[keys[i]] = vec
+    return np.vstack(vecs)
+
+
+# Per-chunk source arrays, keyed by the chunk list's identity.  One
+# object array of interned strings lets the diversity pass gather all
+# candidate sources in a single C-level fancy-index instead of a Python
+# dict lookup per hit.  Plain lists cannot be weakly referenced, so each
+# entry pins the chunk list itself: while an entry lives its id cannot
+# be reused, and the identity check below catches stale slots after the
+# bounded clear.
+_SOURCES_CACHE: dict[int, tuple[list[dict], np.ndarray]] = {}
+
+
+def _sources_array(chunks: list[dict]) -> np.ndarray:
+    entry = _SOURCES_CACHE.get(id(chunks))
+    if entry is not None and entry[0] is chunks:
+        return entry[1]
+    if len(_SOURCES_CACHE) >= 4:
+        _SOURCES_CACHE.clear()
+    arr = np.array([sys.intern(c["source"]) for c in chunks], dtype=object)
+    _SOURCES_CACHE[id(chunks)] = (chunks, arr)
+    return arr
+
+
+# GPU copies of loaded indexes, keyed by the CPU index's identity.  The
+# faiss-cpu wheel has no StandardGpuResources, so this stays empty (and
+# costs nothing) unless faiss-gpu is installed.  The resources object is
+# kept alongside the GPU index because it must outlive it; the leading
+# weakref to the CPU index guards against id reuse after it is freed.
+_GPU_INDEXES: dict[int, tuple] = {}
+
+
+def _searchable_index(index):
+    """Return a GPU-resident copy of *index* when faiss-gpu is available.
+
+    Falls back to the CPU index itself on faiss-cpu builds or when no
+    device is present.
+    """
+    if not hasattr(faiss, "StandardGpuResources"):
+        return index
+    entry = _GPU_INDEXES.get(id(index))
+    if entry is not None and entry[0]() is not index:
+        _GPU_INDEXES.pop(id(index), None)
+        entry = None
+    if entry is None:
+        try:
+            res = faiss.StandardGpuResources()
+            entry = (weakref.ref(index), res, faiss.index_cpu_to_gpu(res, 0, index))
+        except Exception:
+            entry = (weakref.ref(index), None, index)
+        _GPU_INDEXES[id(index)] = entry
+    return entry[2]
+
+
+def _select_diverse(
+    dist: np.ndarray,
+    ids: np.ndarray,
+    chunks: list[dict],
+    top_k: int,
+    min_unique_sources: int,
+) -> list[dict]:
+    """Apply the source-diversity pass to one query's ranked candidates."""
+    srcs = _sources_array(chunks)[ids]
+
+    # Fast path: when the natural top-k already spans enough sources the
+    # reorder below is a no-op, so take the ranked prefix directly.
+    if len(set(srcs[:top_k])) >= min_unique_sources:
+        return [
+            {
+                "content": chunks[ids[pos]]["content"],
+                "source": chunks[ids[pos]]["source"],
+                "score": round(float(dist[pos]), 4),
+                "chunk_index": int(ids[pos]),
+            }
+            for pos in range(min(top_k, len(ids)))
+        ]
+
+    # First occurrence of each source in rank order = that source's best
+    # chunk; keeping the earliest min_unique_sources of them matches the
+    # old best-per-source pass without any dict grouping.
+    _, first_seen = np.unique(srcs, return_index=True)
+    first_seen.sort()
+    selected_pos = list(first_seen[:min_unique_sources])
+    chosen = set(selected_pos)
+
+    # Fill remaining slots with the best-ranked unused candidates
+    for pos in range(len(ids)):
+        if len(selected_pos) >= top_k:
+            break
+        if pos not in chosen:
+            selected_pos.append(pos)
+            chosen.add(pos)
+
+    # Materialize dicts for the final picks only, best-first
+    selected_pos.sort()
+    return [
+        {
+            "content": chunks[ids[pos]]["content"],
+            "source": chunks[ids[pos]]["source"],
+            "score": round(float(dist[pos]), 4),
+            "chunk_index": int(ids[pos]),
+        }
+        for pos in selected_pos[:top_k]
+    ]
+
 
 def retrieve_relevant_docs(
     query: str,
-    index: faiss.IndexFlatL2,
+    index: faiss.Index,
     chunks: list[dict],
     top_k: int = 8,
     min_unique_sources: int = 3,
@@ -31,78 +222,123 @@ def retrieve_relevant_docs(
 
     Algorithm
     ---------
-    1. Over-fetch ``top_k * 3`` candidates from FAISS.
-    2. Group candidates by source document.
-    3. Guarantee at least one chunk from each unique source (up to
-       *min_unique_sources*).
-    4. Fill remaining slots with highest-scoring chunks regardless of
+    1. Over-fetch ``top_k * 3`` candidates from FAISS (ranked best-first).
+    2. Guarantee at least one chunk from each unique source (up to
+       *min_unique_sources*) via first-occurrence-per-source positions.
+    3. Fill remaining slots with best-ranked chunks regardless of
        source.
-    5. Return the top *top_k* results sorted by ascending L2 distance.
+    4. Return the top *top_k* results in rank order.
 
     Returns
     -------
     list[dict]
-        Each dict contains ``content``, ``source``, ``score`` (L2
-        distance — lower is better), and ``chunk_index`` (position in
-        the original chunk list).
+        Each dict contains ``content``, ``source``, ``score``, and
+        ``chunk_index`` (position in the original chunk list). For
+        inner-product (cosine) indexes the score is similarity — higher
+        is better; for legacy L2 indexes it is distance — lower is
+        better.
     """
     if index is None or not chunks:
         return []
 
-    # ── 1. Embed query ──────────────────────────────────────────────────
-    query_vec = get_embeddings_batch([query], input_type="query")
+    # ── 0. Cache lookup ─────────────────────────────────────────────────
+    cache_key = (_normalize_query(query), top_k, min_unique_sources, id(index))
+    cached = _query_cache_get(cache_key, index)
+    if cached is not None:
+        return list(cached)
+
+    # ── 1. Embed query (memoized) ───────────────────────────────────────
+    query_vec = _embed_query(query)
+    # A failed API call yields a zero vector; the search still runs (the
+    # caller gets *something*), but the garbage ranking must never be
+    # memoized — _QUERY_CACHE has no TTL, so it would outlive the outage.
+    embed_ok = bool(query_vec.size and query_vec.any())
+
+    # Inner-product indexes hold L2-normalized vectors (cosine search):
+    # normalize the query to match, and flip the score ordering.
+    higher_better = index.metric_type == faiss.METRIC_INNER_PRODUCT
+    if higher_better:
+        query_vec = np.ascontiguousarray(query_vec, dtype=np.float32).copy()
+        faiss.normalize_L2(query_vec)
 
     # ── 2. Over-fetch from FAISS ────────────────────────────────────────
     fetch_k = min(top_k * 3, index.ntotal)
-    distances, indices = index.search(query_vec, fetch_k)
-
-    # Build candidate list
-    candidates: list[dict] = []
-    for dist, idx in zip(distances[0], indices[0]):
-        if idx < 0:
-            continue
-        chunk = chunks[idx]
-        candidates.append(
-            {
-                "content": chunk["content"],
-                "source": chunk["source"],
-                "score": round(float(dist), 4),
-                "chunk_index": int(idx),
-            }
-        )
+    distances, indices = _searchable_index(index).search(query_vec, fetch_k)
 
-    if not candidates:
+    # FAISS returns hits already ranked best-first for either metric, so
+    # candidate position IS the ranking — no re-sort needed.
+    valid = indices[0] >= 0
+    dist = distances[0][valid]
+    ids = indices[0][valid]
+    if ids.size == 0:
         return []
 
-    # ── 3. Group by source ──────────────────────────────────────────────
-    by_source: dict[str, list[dict]] = defaultdict(list)
-    for c in candidates:
-        by_source[c["source"]].append(c)
+    # ── 3–5. Diversity selection and materialization ────────────────────
+    results = _select_diverse(dist, ids, chunks, top_k, min_unique_sources)
 
-    # ── 4. Diversity selection ──────────────────────────────────────────
-    selected: list[dict] = []
-    used_indices: set[int] = set()
+    if embed_ok:
+        _query_cache_put(cache_key, index, results)
+    return list(results)
 
-    # First pass: pick the best chunk from each unique source
-    source_bests = sorted(
-        [(src, grp[0]) for src, grp in by_source.items()],
-        key=lambda x: x[1]["score"],
-    )
 
-    for src, best in source_bests:
-        if len(selected) >= min_unique_sources:
-            break
-        selected.append(best)
-        used_indices.add(best["chunk_index"])
+def retrieve_relevant_docs_batch(
+    queries: list[str],
+    index: faiss.Index,
+    chunks: list[dict],
+    top_k: int = 8,
+    min_unique_sources: int = 3,
+) -> list[list[dict]]:
+    """Batched variant of :func:`retrieve_relevant_docs`.
 
-    # Second pass: fill remaining slots with top-scoring chunks
-    for c in candidates:
-        if len(selected) >= top_k:
-            break
-        if c["chunk_index"] not in used_indices:
-            selected.append(c)
-            used_indices.add(c["chunk_index"])
+    All uncached queries are embedded in one NIM API call and searched
+    with a single ``index.search`` on the stacked (nq, d) matrix — FAISS
+    parallelizes the batch internally (OpenMP + SIMD), so N concurrent
+    dashboard questions cost roughly one search instead of N.
+
+    Results come back in input order, one list per query, and populate
+    the same per-query result cache as the single-query path.
+    """
+    if index is None or not chunks:
+        return [[] for _ in queries]
+
+    results: list[Optional[list[dict]]] = [None] * len(queries)
+    miss_pos: list[int] = []
+    for i, query in enumerate(queries):
+        cache_key = (_normalize_query(query), top_k, min_unique_sources, id(index))
+        cached = _query_cache_get(cache_key, index)
+        if cached is not None:
+            results[i] = list(cached)
+        else:
+            miss_pos.append(i)
+
+    if miss_pos:
+        vecs = _embed_queries([queries[i] for i in miss_pos])
+        # Zero rows are failed embeddings — searched but never memoized
+        # (same guard as the single-query path).
+        embed_ok = vecs.any(axis=1)
+        higher_better = index.metric_type == faiss.METRIC_INNER_PRODUCT
+        if higher_better:
+            vecs = np.ascontiguousarray(vecs, dtype=np.float32).copy()
+            faiss.normalize_L2(vecs)
+
+        fetch_k = min(top_k * 3, index.ntotal)
+        distances, indices = _searchable_index(index).search(vecs, fetch_k)
+
+        for row, i in enumerate(miss_pos):
+            valid = indices[row] >= 0
+            dist = distances[row][valid]
+            ids = indices[row][valid]
+            picks = (
+                _select_diverse(dist, ids, chunks, top_k, min_unique_sources)
+                if ids.size
+                else []
+            )
+            if embed_ok[row]:
+                cache_key = (
+                    _normalize_query(queries[i]), top_k, min_unique_sources,
+                    id(index),
+                )
+                _query_cache_put(cache_key, index, picks)
+            results[i] = list(picks)
 
-    # ── 5. Sort final results by score ──────────────────────────────────
-    selected.sort(key=lambda x: x["score"])
-    return selected[:top_k]
+    return results  # type: ignore[return-value]
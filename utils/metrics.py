@@ -1,44 +1,70 @@
-"""
-Latency tracking utilities.
-
-Provides a lightweight stopwatch that records the duration of named steps
-in the RAG pipeline (DB queries, embedding, FAISS search, LLM call) so
-that performance can be surfaced in the Streamlit UI.
-"""
-
-import time
-
-
-class LatencyTracker:
-    """Accumulates wall-clock durations for named processing steps."""
-
-    def __init__(self) -> None:
-        self._starts: dict[str, float] = {}
-        self._durations: dict[str, float] = {}
-
-    def start(self, step_name: str) -> None:
-        """Record the start time for *step_name*."""
-        self._starts[step_name] = time.perf_counter()
-
-    def stop(self, step_name: str) -> None:
-        """Record the end time and compute duration for *step_name*."""
-        if step_name not in self._starts:
-            return
-        elapsed = time.perf_counter() - self._starts[step_name]
-        self._durations[step_name] = round(elapsed, 4)
-
-    def get_metrics(self) -> dict[str, float]:
-        """Return all step durations plus a ``total`` key."""
-        metrics = dict(self._durations)
-        metrics["total"] = round(sum(self._durations.values()), 4)
-        return metrics
-
-    def format_metrics(self) -> str:
-        """Return a human-readable summary string."""
-        lines = []
-        for step, dur in self._durations.items():
-            lines.append(f"  {step}: {dur:.3f}s")
-        total = sum(self._durations.values())
-        lines.append(f"  ─────────────────")
-        lines.append(f"  total: {total:.3f}s")
-        return "\n".join(lines)
+"""
+Latency tracking utilities.
+
+Provides a lightweight stopwatch that records the duration of named steps
+in the RAG pipeline (DB queries, embedding, FAISS search, LLM call) so
+that performance can be surfaced in the Streamlit UI.
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class LatencyTracker:
+    """Accumulates wall-clock durations for named processing steps.
+
+    The hot path is a single list append of an integer
+    ``perf_counter_ns`` mark (positive = start, negative = stop); pairing
+    marks and converting to float seconds happens lazily when metrics are
+    read. List appends are atomic, so steps may be timed from worker
+    threads.
+    """
+
+    def __init__(self) -> None:
+        self._log: list[tuple[str, int]] = []
+
+    def start(self, step_name: str) -> None:
+        """Record the start time for *step_name*."""
+        self._log.append((step_name, time.perf_counter_ns()))
+
+    def stop(self, step_name: str) -> None:
+        """Record the end time for *step_name*."""
+        self._log.append((step_name, -time.perf_counter_ns()))
+
+    @contextmanager
+    def __call__(self, step_name: str):
+        """Time a step as a context manager: ``with tracker("embed"): ...``"""
+        self.start(step_name)
+        try:
+            yield self
+        finally:
+            self.stop(step_name)
+
+    def _durations_ns(self) -> dict[str, int]:
+        """Fold the mark log into per-step durations (nanoseconds)."""
+        starts: dict[str, int] = {}
+        durations: dict[str, int] = {}
+        for name, mark in self._log:
+            if mark >= 0:
+                starts[name] = mark
+            elif name in starts:
+                durations[name] = -mark - starts[name]
+        return durations
+
+    def get_metrics(self) -> dict[str, float]:
+        """Return all step durations (seconds) plus a ``total`` key."""
+        durations = self._durations_ns()
+        metrics = {step: round(ns / 1e9, 4) for step, ns in durations.items()}
+        metrics["total"] = round(sum(durations.values()) / 1e9, 4)
+        return metrics
+
+    def format_metrics(self) -> str:
+        """Return a human-readable summary string."""
+        durations = self._durations_ns()
+        lines = []
+        for step, ns in durations.items():
+            lines.append(f"  {step}: {ns / 1e9:.3f}s")
+        total = sum(durations.values()) / 1e9
+        lines.append(f"  ─────────────────")
+        lines.append(f"  total: {total:.3f}s")
+        return "\n".join(lines)